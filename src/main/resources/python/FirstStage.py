@@ -8,9 +8,10 @@ FirstStage genetic algorithm for finding operational treatment strategies.
 Uses GMDH classification models and AHP optimization.
 """
 
-from random import randint
+from functools import lru_cache
 
 import ga_core
+from ga_core import uniform_int
 
 
 logger = ga_core.setup_logging("FirstStage")
@@ -28,80 +29,231 @@ X209_RANGE = (1, 2)
 
 
 def random_solution():
-    """Generate a single random treatment solution."""
-    return [
-        randint(*X201_RANGE) / 100,
-        randint(*X202_RANGE) / 100,
-        randint(*X203_RANGE),
-        randint(*X204_RANGE),
-        randint(*X205_RANGE),
-        randint(*X206_RANGE),
-        randint(*X207_RANGE),
-        randint(*X208_RANGE),
-        randint(*X209_RANGE),
-    ]
+    """Generate a single random treatment solution.
 
+    Solutions are tuples: rows are never modified in place (crossover and
+    mutation always build whole rows), and immutable rows make the shallow
+    population copies in ga_core safe by construction and the rows
+    hashable.
+    """
+    return (
+        uniform_int(*X201_RANGE) / 100,
+        uniform_int(*X202_RANGE) / 100,
+        uniform_int(*X203_RANGE),
+        uniform_int(*X204_RANGE),
+        uniform_int(*X205_RANGE),
+        uniform_int(*X206_RANGE),
+        uniform_int(*X207_RANGE),
+        uniform_int(*X208_RANGE),
+        uniform_int(*X209_RANGE),
+    )
 
-def calculate_criterions(x_list, sol_list):
-    """Calculate condition criteria for a list of solutions."""
-    x101, x102, x103, x104, x105, x106, x107, x108, x109, x110, x111, x112 = x_list
 
-    criterion_list = []
-    for u_list in sol_list:
+@lru_cache(maxsize=4)
+def _patient_kernel(x_tuple):
+    """Build a criterion kernel specialized for one patient.
+
+    Every model term multiplies patient values, solution values, and a
+    fixed coefficient.  The patient values never change within a request,
+    so the patient factors are folded into per-patient constants (cNNN_k;
+    patient-only terms fold into the intercept bNNN) once, and the
+    returned kernel evaluates each term with a single multiply per
+    solution factor.  Trailing comments show the solution factor each
+    folded constant is multiplied by.
+    """
+    x101, x102, x103, x104, x105, x106, x107, x108, x109, x110, x111, x112 = x_tuple
+    inv_x101 = 1.0 / x101
+    inv_x102 = 1.0 / x102
+    inv_x103 = 1.0 / x103
+    inv_x104 = 1.0 / x104
+    inv_x105 = 1.0 / x105
+    inv_x106 = 1.0 / x106
+    inv_x107 = 1.0 / x107
+    inv_x109 = 1.0 / x109
+    inv_x110 = 1.0 / x110
+    inv_x111 = 1.0 / x111
+    inv_x112 = 1.0 / x112
+
+    c301_1 = inv_x111*0.00291197  # * x201
+    c301_2 = x106*(-0.00135807)  # * x208
+    c301_3 = x101*0.000502042  # * x202
+    c301_4 = inv_x109*(-0.00771969)  # * x202
+    c301_5 = inv_x101*35.5495  # * inv_x204
+    b301 = -0.832705 + x105*x109*(-0.00232767) + inv_x101*x112*17.0861 + inv_x103*inv_x109*10.4146
+
+    c302_1 = x105*(-0.0705953)  # * inv_x205
+    c302_2 = inv_x103*(-121.413)  # * inv_x207
+    c302_3 = x111*(-0.585375)  # * inv_x209
+    c302_4 = x107*0.12513  # * inv_x204
+    b302 = 1.8959 + x103*x104*4.62265e-05 + inv_x104*x106*(-0.0233172) + inv_x107*x108*0.0905328 + inv_x105*x109*0.620899 + inv_x106*inv_x109*(-2.62234)
+
+    c303_1 = x106*0.00518668  # * x209
+    c303_2 = inv_x110*0.247751  # * x209
+    c303_3 = x108*0.0123085  # * x204
+    b303 = -0.0102022 + inv_x103*x106*(-0.994431) + x103*x112*(-0.000324448) + inv_x105*x108*(-1.12948) + inv_x103*inv_x109*(-2.46223) + x106*inv_x107*(-0.00429694) + inv_x103*inv_x107*73.8395
+
+    c304_1 = x102*(-0.00673552)  # * x202
+    c304_2 = x107*(-0.00032867)  # * x201
+    c304_3 = inv_x105*(-11.7529)  # * inv_x202
+    c304_4 = x103*(-0.000968004)  # * inv_x206
+    b304 = 1.44158 + x105*x112*(-0.00959038) + x104*x112*(-0.0113419) + x101*x108*0.000239275 + x103*inv_x111*0.0013597
+
+    c305_1 = inv_x103*(-21.4803)  # * x208
+    c305_2 = inv_x109*0.00047157  # * x201
+    c305_3 = x108*0.00862588  # * x202
+    c305_4 = x110*10.1393  # * inv_x203
+    c305_5 = x104*0.00720075  # * x203
+    c305_6 = x110*0.557958  # * inv_x202
+    b305 = -1.6615 + x104*x110*(-0.0346257) + inv_x105*x112*3.10562 + inv_x101*x106*(-0.159258) + inv_x109*inv_x112*(-0.0942774)
+
+    c306_1 = x108*0.0475912  # * x209
+    c306_2 = x111*0.46606  # * x208
+    c306_3 = inv_x112*(-242.356)  # * inv_x201
+    c306_4 = x108*0.30269  # * inv_x208
+    b306 = -0.975001 + inv_x105*x112*0.697149 + x108*inv_x112*0.261032 + x108*x111*(-0.183598) + inv_x106*inv_x112*12.3259 + inv_x106*inv_x111*(-13.7248)
+
+    c307_1 = x112*(-0.0306613)  # * x202
+    c307_2 = inv_x103*(-43.0255)  # * x204
+    c307_3 = x111*0.155946  # * x205
+    c307_4 = x110*0.0941545  # * x208
+    c307_5 = x101*0.00132263  # * x204
+    b307 = -4.40144 + inv_x102*inv_x110*(-3.4971) + inv_x101*inv_x103*6595.83
+
+    c308_1 = inv_x103*(-645.415)  # * inv_x205
+    c308_2 = x103*(-0.000590993)  # * x206
+    c308_3 = x109*(-0.0105553)  # * x204
+    c308_4 = inv_x103*21.8255  # * x203
+    c308_5 = x109*(-0.0813564)  # * x205
+    c308_6 = x101*0.000912961  # * x208
+    b308 = 0.756968 + inv_x101*x109*7.78827 + x101*inv_x103*(-0.507904) + inv_x104*x109*1.49701
+
+    c309_1 = x102*0.0191846  # * x206
+    c309_2 = x101*(-0.00709976)  # * inv_x207
+    c309_3 = inv_x101*(-60.0672)  # * inv_x204
+    c309_4 = x108*0.07052  # * x205
+    c309_5 = x108*(-0.023769)  # * x204
+    c309_6 = x108*0.123772  # * inv_x207
+    b309 = 1.28185 + inv_x104*x106*(-0.0216769) + x105*x108*(-0.00645342) + x104*inv_x105*(-0.24784)
+
+    def kernel(u_list):
+        """Evaluate the nine GMDH models for one solution."""
         x201, x202, x203, x204, x205, x206, x207, x208, x209 = u_list
+        inv_x201 = 1.0 / x201
+        inv_x202 = 1.0 / x202
+        inv_x203 = 1.0 / x203
+        inv_x204 = 1.0 / x204
+        inv_x205 = 1.0 / x205
+        inv_x206 = 1.0 / x206
+        inv_x207 = 1.0 / x207
+        inv_x208 = 1.0 / x208
+        inv_x209 = 1.0 / x209
 
         # GMDH classification models for early postoperative period
-        x301_eq_two = -0.832705 + x111**(-1)*x201*0.00291197 + x106*x208*(-0.00135807) + x105*x109*(-0.00232767) + x101**(-1)*x112*17.0861 + x103**(-1)*x109**(-1)*10.4146 + x101*x202*0.000502042 + x205**(-1)*x207*0.358865 + x109**(-1)*x202*(-0.00771969) + x202*x204**(-1)*(-0.0530489) + x101**(-1)*x204**(-1)*35.5495
-        x302_eq_two = 1.8959 + x103*x104*4.62265e-05 + x105*x205**(-1)*(-0.0705953) + x104**(-1)*x106*(-0.0233172) + x201**(-1)*x207**(-1)*(-41.7888) + x107**(-1)*x108*0.0905328 + x103**(-1)*x207**(-1)*(-121.413) + x111*x209**(-1)*(-0.585375) + x105**(-1)*x109*0.620899 + x106**(-1)*x109**(-1)*(-2.62234) + x107*x204**(-1)*0.12513
-        x303_eq_two = -0.0102022 + x201**(-1)*x203**(-1)*716.757 + x106*x209*0.00518668 + x103**(-1)*x106*(-0.994431) + x103*x112*(-0.000324448) + x105**(-1)*x108*(-1.12948) + x110**(-1)*x209*0.247751 + x103**(-1)*x109**(-1)*(-2.46223) + x106*x107**(-1)*(-0.00429694) + x103**(-1)*x107**(-1)*73.8395 + x108*x204*0.0123085
-        x304_eq_two = 1.44158 + x102*x202*(-0.00673552) + x105*x112*(-0.00959038) + x202*x207**(-1)*0.044888 + x206*x209**(-1)*0.518793 + x104*x112*(-0.0113419) + x101*x108*0.000239275 + x107*x201*(-0.00032867) + x105**(-1)*x202**(-1)*(-11.7529) + x103*x111**(-1)*0.0013597 + x103*x206**(-1)*(-0.000968004)
-        x305_eq_two = -1.6615 + x104*x110*(-0.0346257) + x105**(-1)*x112*3.10562 + x103**(-1)*x208*(-21.4803) + x109**(-1)*x201*0.00047157 + x108*x202*0.00862588 + x110*x203**(-1)*10.1393 + x101**(-1)*x106*(-0.159258) + x109**(-1)*x112**(-1)*(-0.0942774) + x104*x203*0.00720075 + x110*x202**(-1)*0.557958
-        x306_eq_two = -0.975001 + x108*x209*0.0475912 + x105**(-1)*x112*0.697149 + x111*x208*0.46606 + x112**(-1)*x201**(-1)*(-242.356) + x108*x112**(-1)*0.261032 + x201**(-1)*x209*58.4543 + x108*x208**(-1)*0.30269 + x108*x111*(-0.183598) + x106**(-1)*x112**(-1)*12.3259 + x106**(-1)*x111**(-1)*(-13.7248)
-        x307_eq_two = -4.40144 + x102**(-1)*x110**(-1)*(-3.4971) + x112*x202*(-0.0306613) + x103**(-1)*x204*(-43.0255) + x111*x205*0.155946 + x110*x208*0.0941545 + x203*x206**(-1)*0.386844 + x203**(-1)*x206*12.2186 + x101*x204*0.00132263 + x101**(-1)*x103**(-1)*6595.83 + x202*x208*0.0178928
-        x308_eq_two = 0.756968 + x103**(-1)*x205**(-1)*(-645.415) + x101**(-1)*x109*7.78827 + x103*x206*(-0.000590993) + x109*x204*(-0.0105553) + x101*x103**(-1)*(-0.507904) + x103**(-1)*x203*21.8255 + x203**(-1)*x205**(-1)*19.0435 + x109*x205*(-0.0813564) + x104**(-1)*x109*1.49701 + x101*x208*0.000912961
-        x309_eq_two = 1.28185 + x102*x206*0.0191846 + x204*x207*0.0272657 + x101*x207**(-1)*(-0.00709976) + x101**(-1)*x204**(-1)*(-60.0672) + x104**(-1)*x106*(-0.0216769) + x108*x205*0.07052 + x105*x108*(-0.00645342) + x108*x204*(-0.023769) + x108*x207**(-1)*0.123772 + x104*x105**(-1)*(-0.24784)
-
-        c_list = [
-            1 if round(x301_eq_two) == 0 else 2,
-            1 if round(x302_eq_two) == 0 else 2,
-            1 if round(x303_eq_two) == 0 else 2,
-            1 if round(x304_eq_two) == 0 else 2,
-            1 if round(x305_eq_two) == 0 else 2,
-            1 if round(x306_eq_two) == 0 else 2,
-            1 if round(x307_eq_two) == 0 else 2,
-            1 if round(x308_eq_two) == 0 else 2,
-            1 if round(x309_eq_two) == 0 else 2,
-        ]
-        criterion_list.append(c_list)
-
-    return criterion_list
-
-
-def calculate_perfect_value(x_list, coeff_list):
-    """Calculate the ideal Saati value for the given patient."""
+        x301_eq_two = b301 + x201*c301_1 + x208*c301_2 + x202*c301_3 + inv_x205*x207*0.358865 + x202*c301_4 + x202*inv_x204*(-0.0530489) + inv_x204*c301_5
+        x302_eq_two = b302 + inv_x205*c302_1 + inv_x201*inv_x207*(-41.7888) + inv_x207*c302_2 + inv_x209*c302_3 + inv_x204*c302_4
+        x303_eq_two = b303 + inv_x201*inv_x203*716.757 + x209*c303_1 + x209*c303_2 + x204*c303_3
+        x304_eq_two = b304 + x202*c304_1 + x202*inv_x207*0.044888 + x206*inv_x209*0.518793 + x201*c304_2 + inv_x202*c304_3 + inv_x206*c304_4
+        x305_eq_two = b305 + x208*c305_1 + x201*c305_2 + x202*c305_3 + inv_x203*c305_4 + x203*c305_5 + inv_x202*c305_6
+        x306_eq_two = b306 + x209*c306_1 + x208*c306_2 + inv_x201*c306_3 + inv_x201*x209*58.4543 + inv_x208*c306_4
+        x307_eq_two = b307 + x202*c307_1 + x204*c307_2 + x205*c307_3 + x208*c307_4 + x203*inv_x206*0.386844 + inv_x203*x206*12.2186 + x204*c307_5 + x202*x208*0.0178928
+        x308_eq_two = b308 + inv_x205*c308_1 + x206*c308_2 + x204*c308_3 + x203*c308_4 + inv_x203*inv_x205*19.0435 + x205*c308_5 + x208*c308_6
+        x309_eq_two = b309 + x206*c309_1 + x204*x207*0.0272657 + inv_x207*c309_2 + inv_x204*c309_3 + x205*c309_4 + x204*c309_5 + inv_x207*c309_6
+
+        # Equivalent to the original `1 if round(v) == 0 else 2`: banker's
+        # rounding sends both ±0.5 to 0, i.e. round(v) == 0 exactly when
+        # -0.5 <= v <= 0.5.  The compare skips the round() call per model.
+        return (
+            1 if -0.5 <= x301_eq_two <= 0.5 else 2,
+            1 if -0.5 <= x302_eq_two <= 0.5 else 2,
+            1 if -0.5 <= x303_eq_two <= 0.5 else 2,
+            1 if -0.5 <= x304_eq_two <= 0.5 else 2,
+            1 if -0.5 <= x305_eq_two <= 0.5 else 2,
+            1 if -0.5 <= x306_eq_two <= 0.5 else 2,
+            1 if -0.5 <= x307_eq_two <= 0.5 else 2,
+            1 if -0.5 <= x308_eq_two <= 0.5 else 2,
+            1 if -0.5 <= x309_eq_two <= 0.5 else 2,
+        )
+
+    return kernel
+
+
+def calculate_criterions(x_list, sol_list):
+    """Calculate condition criteria for a list of solutions."""
+    kernel = _patient_kernel(tuple(x_list))
+    return [kernel(u_list) for u_list in sol_list]
+
+
+def perfect_criterions(x_list):
+    """Calculate the criterion vector of the ideal outcome for the patient."""
     x101, x102, x103, x104, x105, x106, x107, x108, x109, x110, x111, x112 = x_list
 
-    x303_eq_two = 0.369661 + x106*x111*0.00310719 + x106*x108*(-0.000751507) + x103*x106*(-1.03015e-05) + x103*x108*4.53861e-05 + x111*(-0.357763) + x106*x112*0.00105434 + x102*x112*(-0.00670676) + x102*x108*0.00417287 + x103*0.000583292 + x102*x106*(-8.76937e-05)
-    x304_eq_two = 0.175478 + x110*x112*(-0.154013) + x101*x111*0.0055126 + x103*x107*0.000703851 + x107*x109*(-0.0270747) + x103*x108*(-0.00028867) + x102*x110*0.0515488 + x107*x112*(-0.413692) + x108*x112*0.0185017 + x108*x109*0.00789789 + x101*x110*(-0.00487274) + x102*x111*(-0.0490524) + x101*x108*(-0.000395743) + x101*x107*0.000153086 + x107*0.920759 + x105*x107*(-0.0243143) + x105*x112*0.0514067 + x105*(-0.0825905) + x105*x108*0.00620842
-    x305_eq_two = -0.227066 + x105*x111*(-0.0734265) + x107*x108*(-0.028469) + x103*x107*0.000299704 + x101*x104*0.000299719 + x104*x108*(-0.0224514) + x111*x112*0.358285 + x104*x106*0.000163868 + x103*x106*(-9.55294e-06) + x103*x108*0.0002392 + x105*x106*(-0.000231602) + x108*0.512628 + x108*x112*(-0.0751962) + x105*x110*0.0754866 + x101*x107*(-0.001482) + x102*x108*(-0.0126606) + x106*x108*0.000532562 + x102*x104*0.00464377 + x102*x110*(-0.0334515) + x105*x108*0.00934543 + x105*x112*(-0.0342288) + x101*x102*0.000261614 + x101*x110*(-0.00219381) + x107*x112*0.109794
-    x306_eq_two = -0.0114987 + x108*x109*(-0.00578912) + x104**(-1)*x109**(-1)*1.1257 + x109**(-1)*x112**(-1)*(-0.0419663) + x106*x111**(-1)*(-0.00358674) + x106*x109*(-0.000515749) + x109*x110*0.0632775 + x109*x111*(-0.0298963) + x108*x109**(-1)*0.0109361 + x109**(-1)*x112*(-0.0432296) + x102*x109*0.00138459 + x103**(-1)*x109**(-1)*(-5.55096) + x106**(-1)*x108*0.88429 + x110*x111**(-1)*0.261843 + x106*x108*0.000715337 + x108*x110*(-0.0391553) + x103**(-1)*x108*2.59644 + x106*x107**(-1)*0.000557014 + x107*x110**(-1)*0.341142 + x105*x110**(-1)*(-0.00959482) + x107*x111**(-1)*(-0.0715939) + x106**(-1)*x109*(-0.78666) + x103**(-1)*x106**(-1)*(-656.336) + x106*x110**(-1)*(-0.00633399) + x104**(-1)*x106*0.0286779 + x104**(-1)*x107*(-0.886387) + x107*x109*0.0132561 + x105*x109*(-0.00200309) + x107*x110*(-0.0264503)
-    x307_eq_two = 2.6937 + x101*x110*0.00637564 + x101*x109*(-0.00117356) + x109**2*(-0.00267333) + x105*x111*0.00413604 + x103*x112*(-0.00073236) + x109*0.204242 + x103*x106*1.62601e-05 + x106**2*(-1.08259e-05) + x102*x112*0.153545 + x101*x102*(-0.000396763) + x109*x112*(-0.104191) + x103*0.00284761 + x102*x103*(-0.000144981) + x106*x107*0.00251191 + x103*x110*(-0.000936957) + x101*x105*(-0.000577864) + x104*x105*0.00385265 + x112**2*(-0.83391) + x102*(-0.307295) + x102**2*0.00483699 + x107*(-0.112072) + x104*x110*(-0.0459923) + x101*x104*0.000413922 + x110*x112*0.216481 + x104*x109*0.0068067 + x102*x108*(-0.00353053) + x106*(-0.00962964) + x105*x106*0.000303744 + x107**2*(-0.0391921)
-    x308_eq_two = -1.14363 + x102*x109*0.00138057 + x103*x106*1.10351e-05 + x105*x111*0.122882 + x106*x108*(-0.0012283) + x108*x109*(-0.0121911) + x110**2*0.44975 + x101*x107*0.00167406 + x106*x111*0.00572702 + x103*0.00782358 + x103**2*(-5.48141e-06) + x103*x107*(-0.000982276) + x101**2*(-2.41892e-05) + x103*x108*0.000759317 + x101*x110*0.00210718 + x105*x108*(-0.01283) + x107*x108*0.0327821 + x103*x105*(-0.00028816) + x110*x111*(-0.862231) + x108**2*0.00717402 + x103*x109*0.000164123 + x108*x111*(-0.134656) + x109*x112*(-0.0522137) + x109*0.141487 + x104*x108*0.0154947 + x104*x105*(-0.00406125) + x106*(-0.0119813) + x101*x106*1.94922e-05 + x106*x109*(-0.00031123) + x101*x105*(-0.000104463)
-    x309_eq_two = 1.67402 + x103**(-1)*x111*64.7561 + x108*x109*(-0.00257077) + x103*x109**(-1)*0.000177662 + x101**(-1)*x102**(-1)*(-892.92) + x108*x109**(-1)*(-0.0215984) + x105*x109*0.00529672 + x107*x109*(-0.0818487) + x106**(-1)*x107**(-1)*8.77323 + x103**(-1)*x106*(-1.63549) + x101*x103*(-1.69885e-05) + x105**(-1)*x110**(-1)*(-4.57522) + x106**(-1)*x108*2.06638 + x104*x109**(-1)*0.00764918 + x107**(-1)*x112**(-1)*(-1.33627) + x107**(-1)*x111**(-1)*0.163089 + x109*x112**(-1)*(-0.250843) + x102**(-1)*x109*2.04587 + x110*x111**(-1)*0.144078 + x102*x112**(-1)*0.0875985 + x102**(-1)*x112*4.40152 + x101*x105*(-0.000362291) + x102**(-1)*x106**(-1)*(-267.832) + x101*x106*3.30086e-05 + x102*x110*(-0.0331608) + x107**(-1)*x110*0.687005 + x104*x105**(-1)*(-0.523747) + x104**(-1)*x107**(-1)*(-8.04198) + x101*x107*0.000894778 + x101**(-1)*x107**(-1)*26.1572
+    # The 30-term polynomials below repeat many reciprocals and pairwise
+    # products; each shared subexpression is computed once (trailing
+    # comments give its number of uses).  Factor order within each term
+    # is preserved, so the values are bit-for-bit unchanged.
+    inv_x101 = 1.0 / x101
+    inv_x102 = 1.0 / x102
+    inv_x103 = 1.0 / x103
+    inv_x104 = 1.0 / x104
+    inv_x105 = 1.0 / x105
+    inv_x106 = 1.0 / x106
+    inv_x107 = 1.0 / x107
+    inv_x109 = 1.0 / x109
+    inv_x110 = 1.0 / x110
+    inv_x111 = 1.0 / x111
+    inv_x112 = 1.0 / x112
 
-    c_list = [
-        1, 1,  # x301, x302 always 1 for perfect
-        1 if round(x303_eq_two) == 0 else 2,
-        1 if round(x304_eq_two) == 0 else 2,
-        1 if round(x305_eq_two) == 0 else 2,
-        1 if round(x306_eq_two) == 0 else 2,
-        1 if round(x307_eq_two) == 0 else 2,
-        1 if round(x308_eq_two) == 0 else 2,
-        1 if round(x309_eq_two) == 0 else 2,
-    ]
+    p_101_102 = x101 * x102  # used 2x
+    p_101_104 = x101 * x104  # used 2x
+    p_101_105 = x101 * x105  # used 3x
+    p_101_106 = x101 * x106  # used 2x
+    p_101_107 = x101 * x107  # used 4x
+    p_101_110 = x101 * x110  # used 4x
+    p_102_108 = x102 * x108  # used 3x
+    p_102_109 = x102 * x109  # used 2x
+    p_102_110 = x102 * x110  # used 3x
+    p_102_112 = x102 * x112  # used 2x
+    p_103_106 = x103 * x106  # used 4x
+    p_103_107 = x103 * x107  # used 3x
+    p_103_108 = x103 * x108  # used 4x
+    p_104_105 = x104 * x105  # used 2x
+    p_104_108 = x104 * x108  # used 2x
+    p_105_106 = x105 * x106  # used 2x
+    p_105_108 = x105 * x108  # used 3x
+    p_105_109 = x105 * x109  # used 2x
+    p_105_111 = x105 * x111  # used 3x
+    p_105_112 = x105 * x112  # used 2x
+    p_106_108 = x106 * x108  # used 4x
+    p_106_109 = x106 * x109  # used 2x
+    p_106_111 = x106 * x111  # used 2x
+    p_107_108 = x107 * x108  # used 2x
+    p_107_109 = x107 * x109  # used 3x
+    p_107_112 = x107 * x112  # used 2x
+    p_108_109 = x108 * x109  # used 4x
+    p_108_112 = x108 * x112  # used 2x
+    p_108_i109 = x108 * inv_x109  # used 2x
+    p_109_112 = x109 * x112  # used 2x
+    p_110_112 = x110 * x112  # used 2x
+    p_110_i111 = x110 * inv_x111  # used 2x
+    p_i106_108 = inv_x106 * x108  # used 2x
 
-    saati_value = sum(-c * coeff for c, coeff in zip(c_list, coeff_list))
-    return round(saati_value, 15)
+    x303_eq_two = 0.369661 + p_106_111*0.00310719 + p_106_108*(-0.000751507) + p_103_106*(-1.03015e-05) + p_103_108*4.53861e-05 + x111*(-0.357763) + x106*x112*0.00105434 + p_102_112*(-0.00670676) + p_102_108*0.00417287 + x103*0.000583292 + x102*x106*(-8.76937e-05)
+    x304_eq_two = 0.175478 + p_110_112*(-0.154013) + x101*x111*0.0055126 + p_103_107*0.000703851 + p_107_109*(-0.0270747) + p_103_108*(-0.00028867) + p_102_110*0.0515488 + p_107_112*(-0.413692) + p_108_112*0.0185017 + p_108_109*0.00789789 + p_101_110*(-0.00487274) + x102*x111*(-0.0490524) + x101*x108*(-0.000395743) + p_101_107*0.000153086 + x107*0.920759 + x105*x107*(-0.0243143) + p_105_112*0.0514067 + x105*(-0.0825905) + p_105_108*0.00620842
+    x305_eq_two = -0.227066 + p_105_111*(-0.0734265) + p_107_108*(-0.028469) + p_103_107*0.000299704 + p_101_104*0.000299719 + p_104_108*(-0.0224514) + x111*x112*0.358285 + x104*x106*0.000163868 + p_103_106*(-9.55294e-06) + p_103_108*0.0002392 + p_105_106*(-0.000231602) + x108*0.512628 + p_108_112*(-0.0751962) + x105*x110*0.0754866 + p_101_107*(-0.001482) + p_102_108*(-0.0126606) + p_106_108*0.000532562 + x102*x104*0.00464377 + p_102_110*(-0.0334515) + p_105_108*0.00934543 + p_105_112*(-0.0342288) + p_101_102*0.000261614 + p_101_110*(-0.00219381) + p_107_112*0.109794
+    x306_eq_two = -0.0114987 + p_108_109*(-0.00578912) + inv_x104*inv_x109*1.1257 + inv_x109*inv_x112*(-0.0419663) + x106*inv_x111*(-0.00358674) + p_106_109*(-0.000515749) + x109*x110*0.0632775 + x109*x111*(-0.0298963) + p_108_i109*0.0109361 + inv_x109*x112*(-0.0432296) + p_102_109*0.00138459 + inv_x103*inv_x109*(-5.55096) + p_i106_108*0.88429 + p_110_i111*0.261843 + p_106_108*0.000715337 + x108*x110*(-0.0391553) + inv_x103*x108*2.59644 + x106*inv_x107*0.000557014 + x107*inv_x110*0.341142 + x105*inv_x110*(-0.00959482) + x107*inv_x111*(-0.0715939) + inv_x106*x109*(-0.78666) + inv_x103*inv_x106*(-656.336) + x106*inv_x110*(-0.00633399) + inv_x104*x106*0.0286779 + inv_x104*x107*(-0.886387) + p_107_109*0.0132561 + p_105_109*(-0.00200309) + x107*x110*(-0.0264503)
+    x307_eq_two = 2.6937 + p_101_110*0.00637564 + x101*x109*(-0.00117356) + x109**2*(-0.00267333) + p_105_111*0.00413604 + x103*x112*(-0.00073236) + x109*0.204242 + p_103_106*1.62601e-05 + x106**2*(-1.08259e-05) + p_102_112*0.153545 + p_101_102*(-0.000396763) + p_109_112*(-0.104191) + x103*0.00284761 + x102*x103*(-0.000144981) + x106*x107*0.00251191 + x103*x110*(-0.000936957) + p_101_105*(-0.000577864) + p_104_105*0.00385265 + x112**2*(-0.83391) + x102*(-0.307295) + x102**2*0.00483699 + x107*(-0.112072) + x104*x110*(-0.0459923) + p_101_104*0.000413922 + p_110_112*0.216481 + x104*x109*0.0068067 + p_102_108*(-0.00353053) + x106*(-0.00962964) + p_105_106*0.000303744 + x107**2*(-0.0391921)
+    x308_eq_two = -1.14363 + p_102_109*0.00138057 + p_103_106*1.10351e-05 + p_105_111*0.122882 + p_106_108*(-0.0012283) + p_108_109*(-0.0121911) + x110**2*0.44975 + p_101_107*0.00167406 + p_106_111*0.00572702 + x103*0.00782358 + x103**2*(-5.48141e-06) + p_103_107*(-0.000982276) + x101**2*(-2.41892e-05) + p_103_108*0.000759317 + p_101_110*0.00210718 + p_105_108*(-0.01283) + p_107_108*0.0327821 + x103*x105*(-0.00028816) + x110*x111*(-0.862231) + x108**2*0.00717402 + x103*x109*0.000164123 + x108*x111*(-0.134656) + p_109_112*(-0.0522137) + x109*0.141487 + p_104_108*0.0154947 + p_104_105*(-0.00406125) + x106*(-0.0119813) + p_101_106*1.94922e-05 + p_106_109*(-0.00031123) + p_101_105*(-0.000104463)
+    x309_eq_two = 1.67402 + inv_x103*x111*64.7561 + p_108_109*(-0.00257077) + x103*inv_x109*0.000177662 + inv_x101*inv_x102*(-892.92) + p_108_i109*(-0.0215984) + p_105_109*0.00529672 + p_107_109*(-0.0818487) + inv_x106*inv_x107*8.77323 + inv_x103*x106*(-1.63549) + x101*x103*(-1.69885e-05) + inv_x105*inv_x110*(-4.57522) + p_i106_108*2.06638 + x104*inv_x109*0.00764918 + inv_x107*inv_x112*(-1.33627) + inv_x107*inv_x111*0.163089 + x109*inv_x112*(-0.250843) + inv_x102*x109*2.04587 + p_110_i111*0.144078 + x102*inv_x112*0.0875985 + inv_x102*x112*4.40152 + p_101_105*(-0.000362291) + inv_x102*inv_x106*(-267.832) + p_101_106*3.30086e-05 + p_102_110*(-0.0331608) + inv_x107*x110*0.687005 + x104*inv_x105*(-0.523747) + inv_x104*inv_x107*(-8.04198) + p_101_107*0.000894778 + inv_x101*inv_x107*26.1572
+    return (
+        1, 1,  # x301, x302 always 1 for perfect
+        1 if -0.5 <= x303_eq_two <= 0.5 else 2,
+        1 if -0.5 <= x304_eq_two <= 0.5 else 2,
+        1 if -0.5 <= x305_eq_two <= 0.5 else 2,
+        1 if -0.5 <= x306_eq_two <= 0.5 else 2,
+        1 if -0.5 <= x307_eq_two <= 0.5 else 2,
+        1 if -0.5 <= x308_eq_two <= 0.5 else 2,
+        1 if -0.5 <= x309_eq_two <= 0.5 else 2,
+    )
 
 
 def main():
@@ -110,7 +262,7 @@ def main():
         12,
         random_solution,
         calculate_criterions,
-        calculate_perfect_value,
+        perfect_criterions,
         logger,
     )
 
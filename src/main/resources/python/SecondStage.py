@@ -8,9 +8,10 @@ SecondStage genetic algorithm for finding conservative (medication) treatment st
 Uses GMDH classification models and AHP optimization.
 """
 
-from random import randint
+from functools import lru_cache
 
 import ga_core
+from ga_core import uniform_int
 
 
 logger = ga_core.setup_logging("SecondStage")
@@ -28,64 +29,179 @@ X409_RANGE = (1, 2)
 
 
 def random_solution():
-    """Generate a single random medication solution."""
-    return [
-        randint(*X401_RANGE) / 100,
-        randint(*X402_RANGE),
-        randint(*X403_RANGE) / 100,
-        randint(*X404_RANGE),
-        randint(*X405_RANGE),
-        randint(*X406_RANGE),
-        randint(*X407_RANGE),
-        randint(*X408_RANGE),
-        randint(*X409_RANGE),
-    ]
-
+    """Generate a single random medication solution.
+
+    Solutions are tuples for the same reasons as in FirstStage: rows are
+    never modified in place, and immutable rows keep the population
+    copy-free in ga_core and the rows hashable for the criterion cache.
+    """
+    return (
+        uniform_int(*X401_RANGE) / 100,
+        uniform_int(*X402_RANGE),
+        uniform_int(*X403_RANGE) / 100,
+        uniform_int(*X404_RANGE),
+        uniform_int(*X405_RANGE),
+        uniform_int(*X406_RANGE),
+        uniform_int(*X407_RANGE),
+        uniform_int(*X408_RANGE),
+        uniform_int(*X409_RANGE),
+    )
 
-def calculate_criterions(x_list, sol_list):
-    """Calculate condition criteria for late postoperative period."""
-    x301, x302, x303, x304, x305, x306, x307, x308, x309 = x_list
 
-    criterion_list = []
-    for u_list in sol_list:
+@lru_cache(maxsize=4)
+def _patient_kernel(x_tuple):
+    """Build a criterion kernel specialized for one patient.
+
+    Same partial evaluation as in FirstStage: the condition values are
+    fixed for the whole request, so every term's condition factors are
+    folded with its coefficient into per-patient constants (cNNN_k;
+    condition-only terms fold into the intercept bNNN) once, and the
+    returned kernel touches only the solution factors.  Trailing comments
+    show the solution factor each folded constant is multiplied by.
+    """
+    x301, x302, x303, x304, x305, x306, x307, x308, x309 = x_tuple
+    inv_x301 = 1.0 / x301
+    inv_x302 = 1.0 / x302
+    inv_x303 = 1.0 / x303
+    inv_x304 = 1.0 / x304
+    inv_x305 = 1.0 / x305
+    inv_x306 = 1.0 / x306
+    inv_x307 = 1.0 / x307
+    inv_x308 = 1.0 / x308
+    inv_x309 = 1.0 / x309
+
+    c501_1 = inv_x301*0.910959  # * inv_x405
+    c501_2 = x301*4.30283  # * x403
+    c501_3 = x303*(-1.25164)  # * x403
+    c501_4 = inv_x304*(-1.13018)  # * inv_x405
+    c501_5 = inv_x306*(-2.07729)  # * inv_x404
+    c501_6 = inv_x305*(-10.406)  # * inv_x401
+    c501_7 = inv_x305*0.101907  # * x404
+    c501_8 = inv_x302*1.15775  # * inv_x405
+    c501_9 = x301*(-0.122005)  # * x407
+    c501_10 = x308*5.83819  # * inv_x402
+    c501_11 = inv_x301*(-0.0369662)  # * x404
+    b501 = 0.203898 + x308*inv_x309*(-0.382442) + x302*x303*0.17399
+
+    c502_1 = inv_x305*1.09482  # * inv_x406
+    c502_2 = x304*2.72805  # * x403
+    c502_3 = inv_x302*2.92486  # * inv_x401
+    c502_4 = inv_x308*(-1.36086)  # * inv_x405
+    c502_5 = x301*1.09577  # * inv_x407
+    c502_6 = x301*(-0.783258)  # * inv_x405
+    c502_7 = inv_x303*(-0.36206)  # * x409
+    c502_8 = inv_x304*(-1.03788)  # * inv_x406
+    b502 = -0.471431 + inv_x304*inv_x307*1.72336
+
+    c503_1 = inv_x308*2.31705  # * inv_x404
+    c503_2 = x304*(-0.111947)  # * x406
+    c503_3 = inv_x303*0.0271928  # * x401
+    b503 = 1.95339
+
+    c504_1 = inv_x308*2.06499  # * inv_x407
+    c504_2 = inv_x301*0.6211  # * x407
+    c504_3 = x301*0.136269  # * x405
+    c504_4 = x301*0.514069  # * inv_x401
+    b504 = 1.06655 + inv_x303*inv_x307*(-1.33289) + inv_x301*inv_x308*(-1.01545) + inv_x305*x309*(-0.303684)
+
+    c505_1 = inv_x308*1.15482  # * inv_x406
+    c505_2 = inv_x301*(-0.224786)  # * inv_x408
+    c505_3 = inv_x306*(-3.10445)  # * x403
+    c505_4 = x302*(-0.143367)  # * x407
+    c505_5 = inv_x302*(-0.655295)  # * inv_x407
+    c505_6 = inv_x304*(-0.303317)  # * x406
+    c505_7 = x306*(-0.768984)  # * inv_x404
+    c505_8 = inv_x303*6.71103  # * inv_x402
+    b505 = 0.091119 + x304*x309*(-0.234552) + x303*inv_x305*(-0.468262)
+
+    c506_1 = inv_x304*7.87555  # * inv_x401
+    c506_2 = inv_x309*(-2.69499)  # * x408
+    c506_3 = inv_x303*58.3697  # * inv_x402
+    c506_4 = inv_x303*(-8.91198)  # * inv_x401
+    c506_5 = x309*(-57.1008)  # * inv_x402
+    c506_6 = inv_x301*12.9686  # * inv_x402
+    c506_7 = inv_x308*(-0.0536574)  # * x404
+    c506_8 = inv_x305*2.98424  # * x403
+    c506_9 = x302*(-1.11811)  # * inv_x409
+    c506_10 = x304*25.7593  # * inv_x402
+    b506 = 1.22334 + x305*x307*0.186573 + x302*inv_x304*0.874263
+
+    c507_1 = x302*0.0657112  # * x409
+    c507_2 = x303*0.208682  # * x408
+    c507_3 = x301*(-0.624969)  # * x408
+    c507_4 = x301*0.014996  # * x401
+    c507_5 = x302*(-0.0180873)  # * x401
+    c507_6 = x302*(-4.60527)  # * x403
+    c507_7 = x304*8.3029  # * x403
+    c507_8 = x301*(-7.86307)  # * x403
+    b507 = 2.70189 + x301**2*0.387945 + x305*x308*(-0.0851309) + x306*x307*(-0.232534) + x303*x304*(-0.192993) + x302*x309*(-0.118495)
+
+    c508_1 = x302*0.293381  # * x408
+    c508_2 = x308*(-0.45356)  # * x406
+    c508_3 = x304*0.439602  # * x406
+    c508_4 = x305*0.040654  # * x401
+    b508 = 0.491547 + x301*x304*0.150368 + x304*x306*(-0.153749) + x304*x305*(-0.142557)
+
+    c509_1 = x302*(-0.0107084)  # * x404
+    c509_2 = x301*0.0394856  # * x401
+    c509_3 = x306*(-0.0306855)  # * x401
+    c509_4 = x301*(-0.109036)  # * x408
+    c509_5 = inv_x306*(-2.45236)  # * x403
+    b509 = 2.24957 + x307*x308*(-0.184216) + x302*inv_x303*(-0.230414) + inv_x304*inv_x306*0.715238
+
+    def kernel(u_list):
+        """Evaluate the nine GMDH models for one solution."""
         x401, x402, x403, x404, x405, x406, x407, x408, x409 = u_list
+        inv_x401 = 1.0 / x401
+        inv_x402 = 1.0 / x402
+        inv_x404 = 1.0 / x404
+        inv_x405 = 1.0 / x405
+        inv_x406 = 1.0 / x406
+        inv_x407 = 1.0 / x407
+        inv_x408 = 1.0 / x408
+        inv_x409 = 1.0 / x409
 
         # GMDH classification models for late postoperative period
-        x501_eq_two = 0.203898 + x301**(-1)*x405**(-1)*0.910959 + x404**(-1)*x405*0.427516 + x403*x406**(-1)*(-3.25314) + x301*x403*4.30283 + x404*x405**(-1)*(-0.0507695) + x303*x403*(-1.25164) + x304**(-1)*x405**(-1)*(-1.13018) + x401*x409**(-1)*0.013292 + x308*x309**(-1)*(-0.382442) + x306**(-1)*x404**(-1)*(-2.07729) + x401**(-1)*x409*1.05208 + x402**(-1)*x407**(-1)*(-19.254) + x404*x409*(-0.0224005) + x305**(-1)*x401**(-1)*(-10.406) + x305**(-1)*x404*0.101907 + x401**(-1)*x405**(-1)*3.49662 + x302**(-1)*x405**(-1)*1.15775 + x302*x303*0.17399 + x401**(-1)*x404**(-1)*(-7.90677) + x301*x407*(-0.122005) + x308*x402**(-1)*5.83819 + x301**(-1)*x404*(-0.0369662) + x401**(-1)*x407**(-1)*2.73641
-        x502_eq_two = -0.471431 + x305**(-1)*x406**(-1)*1.09482 + x403*x408*(-3.06197) + x304*x403*2.72805 + x302**(-1)*x401**(-1)*2.92486 + x304**(-1)*x307**(-1)*1.72336 + x402**(-1)*x408**(-1)*(-5.41859) + x402*x404**(-1)*(-0.0445508) + x405*x407**(-1)*(-0.298849) + x308**(-1)*x405**(-1)*(-1.36086) + x301*x407**(-1)*1.09577 + x301*x405**(-1)*(-0.783258) + x402**(-1)*x404*(-0.493502) + x401*x404**(-1)*0.0744676 + x405**(-1)*x406*0.265279 + x406**(-1)*x407*0.501585 + x303**(-1)*x409*(-0.36206) + x405**(-1)*x407**(-1)*0.802625 + x304**(-1)*x406**(-1)*(-1.03788)
-        x503_eq_two = 1.95339 + x408**(-1)*x409**(-1)*0.32464 + x308**(-1)*x404**(-1)*2.31705 + x407*x408*(-0.276162) + x407**(-1)*x408**(-1)*(-2.4394) + x304*x406*(-0.111947) + x404*x407**(-1)*0.0305552 + x405**(-1)*x408**(-1)*1.27569 + x401*x405**(-1)*(-0.0607239) + x401**(-1)*x409*(-1.0994) + x303**(-1)*x401*0.0271928
-        x504_eq_two = 1.06655 + x403*x409**(-1)*3.59357 + x406**(-1)*x407**(-1)*(-1.19368) + x404*x405*(-0.00880017) + x308**(-1)*x407**(-1)*2.06499 + x401*x403*(-0.150814) + x402*x407**(-1)*0.011523 + x301**(-1)*x407*0.6211 + x401*x405**(-1)*0.0241819 + x401*x404**(-1)*(-0.0143991) + x301*x405*0.136269 + x405*x407*(-0.00884287) + x407*x408*(-0.211492) + x404*x407*0.00221758 + x303**(-1)*x307**(-1)*(-1.33289) + x301**(-1)*x308**(-1)*(-1.01545) + x405*x408**(-1)*(-0.206286) + x305**(-1)*x309*(-0.303684) + x402**(-1)*x409*(-1.84102) + x301*x401**(-1)*0.514069
-        x505_eq_two = 0.091119 + x308**(-1)*x406**(-1)*1.15482 + x304*x309*(-0.234552) + x303*x305**(-1)*(-0.468262) + x401*x402*(-0.00120581) + x407**(-1)*x408**(-1)*2.20372 + x407*x408*0.203365 + x301**(-1)*x408**(-1)*(-0.224786) + x403*x407**(-1)*1.75401 + x402*x404**(-1)*0.0515831 + x401*x408**(-1)*0.0186275 + x306**(-1)*x403*(-3.10445) + x404*x408*0.0266439 + x302*x407*(-0.143367) + x302**(-1)*x407**(-1)*(-0.655295) + x403*x409**(-1)*3.61478 + x403*x408**(-1)*(-4.82115) + x401**(-1)*x404*(-0.222182) + x401**(-1)*x405**(-1)*1.68566 + x403*x404*0.154106 + x404**(-1)*x406*1.94052 + x401*x407*0.0123596 + x404**(-1)*x407**(-1)*(-1.7251) + x304**(-1)*x406*(-0.303317) + x306*x404**(-1)*(-0.768984) + x303**(-1)*x402**(-1)*6.71103
-        x506_eq_two = 1.22334 + x403*x406*0.64041 + x402**(-1)*x404*1.92831 + x305*x307*0.186573 + x403*x404*(-0.204982) + x401**(-1)*x408**(-1)*(-12.1129) + x304**(-1)*x401**(-1)*7.87555 + x309**(-1)*x408*(-2.69499) + x302*x304**(-1)*0.874263 + x401**(-1)*x402*0.113644 + x303**(-1)*x402**(-1)*58.3697 + x303**(-1)*x401**(-1)*(-8.91198) + x309*x402**(-1)*(-57.1008) + x301**(-1)*x402**(-1)*12.9686 + x402**(-1)*x409*11.804 + x408*x409**(-1)*1.0522 + x308**(-1)*x404*(-0.0536574) + x305**(-1)*x403*2.98424 + x302*x409**(-1)*(-1.11811) + x304*x402**(-1)*25.7593 + x405**(-1)*x407*0.086348 + x401**(-1)*x409**(-1)*5.31789 + x401*x409*(-0.00743753)
-        x507_eq_two = 2.70189 + x301**2*0.387945 + x305*x308*(-0.0851309) + x306*x307*(-0.232534) + x302*x409*0.0657112 + x303*x408*0.208682 + x403*x407*(-2.58931) + x403*x405*2.53922 + x402*x403*(-0.205441) + x301*x408*(-0.624969) + x401*x404*(-0.00361108) + x301*x401*0.014996 + x402*x404*0.000855651 + x302*x401*(-0.0180873) + x403*x409*3.3802 + x302*x403*(-4.60527) + x304*x403*8.3029 + x303*x304*(-0.192993) + x407*x408*0.22353 + x407*x409*(-0.159675) + x302*x309*(-0.118495) + x301*x403*(-7.86307) + x406*x407*(-0.0519393) + x403**2*(-10.6638) + x403*x408*3.47469 + x403*x406*(-1.3094) + x401**2*0.000791461
-        x508_eq_two = 0.491547 + x302*x408*0.293381 + x402*x407*(-0.00138491) + x403*x404*(-0.10257) + x405*x406*0.102928 + x301*x304*0.150368 + x401*x408*(-0.0278252) + x404*x405*(-0.00818883) + x404*x409*0.0115062 + x308*x406*(-0.45356) + x304*x406*0.439602 + x304*x306*(-0.153749) + x305*x401*0.040654 + x401*x407*(-0.0169291) + x401*x402*(-0.000416154) + x304*x305*(-0.142557)
-        x509_eq_two = 2.24957 + x307*x308*(-0.184216) + x401**(-1)*x404*0.149113 + x302*x404*(-0.0107084) + x402**(-1)*x407**(-1)*(-8.19724) + x403*x405**(-1)*(-6.10407) + x403*x409*3.4668 + x408**(-1)*x409*(-0.35094) + x301*x401*0.0394856 + x306*x401*(-0.0306855) + x302*x303**(-1)*(-0.230414) + x405*x407*(-0.0215096) + x301*x408*(-0.109036) + x306**(-1)*x403*(-2.45236) + x304**(-1)*x306**(-1)*0.715238
-
-        c_list = [
-            1 if round(x501_eq_two) == 0 else 2,
-            1 if round(x502_eq_two) == 0 else 2,
-            1 if round(x503_eq_two) == 0 else 2,
-            1 if round(x504_eq_two) == 0 else 2,
-            1 if round(x505_eq_two) == 0 else 2,
-            1 if round(x506_eq_two) == 0 else 2,
-            1 if round(x507_eq_two) == 0 else 2,
-            1 if round(x508_eq_two) == 0 else 2,
-            1 if round(x509_eq_two) == 0 else 2,
-        ]
-        criterion_list.append(c_list)
-
-    return criterion_list
-
-
-def calculate_perfect_value(x_list, coeff_list):
-    """Calculate the ideal Saati value for the given condition."""
+        x501_eq_two = b501 + inv_x405*c501_1 + inv_x404*x405*0.427516 + x403*inv_x406*(-3.25314) + x403*c501_2 + x404*inv_x405*(-0.0507695) + x403*c501_3 + inv_x405*c501_4 + x401*inv_x409*0.013292 + inv_x404*c501_5 + inv_x401*x409*1.05208 + inv_x402*inv_x407*(-19.254) + x404*x409*(-0.0224005) + inv_x401*c501_6 + x404*c501_7 + inv_x401*inv_x405*3.49662 + inv_x405*c501_8 + inv_x401*inv_x404*(-7.90677) + x407*c501_9 + inv_x402*c501_10 + x404*c501_11 + inv_x401*inv_x407*2.73641
+        x502_eq_two = b502 + inv_x406*c502_1 + x403*x408*(-3.06197) + x403*c502_2 + inv_x401*c502_3 + inv_x402*inv_x408*(-5.41859) + x402*inv_x404*(-0.0445508) + x405*inv_x407*(-0.298849) + inv_x405*c502_4 + inv_x407*c502_5 + inv_x405*c502_6 + inv_x402*x404*(-0.493502) + x401*inv_x404*0.0744676 + inv_x405*x406*0.265279 + inv_x406*x407*0.501585 + x409*c502_7 + inv_x405*inv_x407*0.802625 + inv_x406*c502_8
+        x503_eq_two = b503 + inv_x408*inv_x409*0.32464 + inv_x404*c503_1 + x407*x408*(-0.276162) + inv_x407*inv_x408*(-2.4394) + x406*c503_2 + x404*inv_x407*0.0305552 + inv_x405*inv_x408*1.27569 + x401*inv_x405*(-0.0607239) + inv_x401*x409*(-1.0994) + x401*c503_3
+        x504_eq_two = b504 + x403*inv_x409*3.59357 + inv_x406*inv_x407*(-1.19368) + x404*x405*(-0.00880017) + inv_x407*c504_1 + x401*x403*(-0.150814) + x402*inv_x407*0.011523 + x407*c504_2 + x401*inv_x405*0.0241819 + x401*inv_x404*(-0.0143991) + x405*c504_3 + x405*x407*(-0.00884287) + x407*x408*(-0.211492) + x404*x407*0.00221758 + x405*inv_x408*(-0.206286) + inv_x402*x409*(-1.84102) + inv_x401*c504_4
+        x505_eq_two = b505 + inv_x406*c505_1 + x401*x402*(-0.00120581) + inv_x407*inv_x408*2.20372 + x407*x408*0.203365 + inv_x408*c505_2 + x403*inv_x407*1.75401 + x402*inv_x404*0.0515831 + x401*inv_x408*0.0186275 + x403*c505_3 + x404*x408*0.0266439 + x407*c505_4 + inv_x407*c505_5 + x403*inv_x409*3.61478 + x403*inv_x408*(-4.82115) + inv_x401*x404*(-0.222182) + inv_x401*inv_x405*1.68566 + x403*x404*0.154106 + inv_x404*x406*1.94052 + x401*x407*0.0123596 + inv_x404*inv_x407*(-1.7251) + x406*c505_6 + inv_x404*c505_7 + inv_x402*c505_8
+        x506_eq_two = b506 + x403*x406*0.64041 + inv_x402*x404*1.92831 + x403*x404*(-0.204982) + inv_x401*inv_x408*(-12.1129) + inv_x401*c506_1 + x408*c506_2 + inv_x401*x402*0.113644 + inv_x402*c506_3 + inv_x401*c506_4 + inv_x402*c506_5 + inv_x402*c506_6 + inv_x402*x409*11.804 + x408*inv_x409*1.0522 + x404*c506_7 + x403*c506_8 + inv_x409*c506_9 + inv_x402*c506_10 + inv_x405*x407*0.086348 + inv_x401*inv_x409*5.31789 + x401*x409*(-0.00743753)
+        x507_eq_two = b507 + x409*c507_1 + x408*c507_2 + x403*x407*(-2.58931) + x403*x405*2.53922 + x402*x403*(-0.205441) + x408*c507_3 + x401*x404*(-0.00361108) + x401*c507_4 + x402*x404*0.000855651 + x401*c507_5 + x403*x409*3.3802 + x403*c507_6 + x403*c507_7 + x407*x408*0.22353 + x407*x409*(-0.159675) + x403*c507_8 + x406*x407*(-0.0519393) + x403**2*(-10.6638) + x403*x408*3.47469 + x403*x406*(-1.3094) + x401**2*0.000791461
+        x508_eq_two = b508 + x408*c508_1 + x402*x407*(-0.00138491) + x403*x404*(-0.10257) + x405*x406*0.102928 + x401*x408*(-0.0278252) + x404*x405*(-0.00818883) + x404*x409*0.0115062 + x406*c508_2 + x406*c508_3 + x401*c508_4 + x401*x407*(-0.0169291) + x401*x402*(-0.000416154)
+        x509_eq_two = b509 + inv_x401*x404*0.149113 + x404*c509_1 + inv_x402*inv_x407*(-8.19724) + x403*inv_x405*(-6.10407) + x403*x409*3.4668 + inv_x408*x409*(-0.35094) + x401*c509_2 + x401*c509_3 + x405*x407*(-0.0215096) + x408*c509_4 + x403*c509_5
+
+        # Equivalent to the original `1 if round(v) == 0 else 2`: banker's
+        # rounding sends both ±0.5 to 0, i.e. round(v) == 0 exactly when
+        # -0.5 <= v <= 0.5.  The compare skips the round() call per model.
+        return (
+            1 if -0.5 <= x501_eq_two <= 0.5 else 2,
+            1 if -0.5 <= x502_eq_two <= 0.5 else 2,
+            1 if -0.5 <= x503_eq_two <= 0.5 else 2,
+            1 if -0.5 <= x504_eq_two <= 0.5 else 2,
+            1 if -0.5 <= x505_eq_two <= 0.5 else 2,
+            1 if -0.5 <= x506_eq_two <= 0.5 else 2,
+            1 if -0.5 <= x507_eq_two <= 0.5 else 2,
+            1 if -0.5 <= x508_eq_two <= 0.5 else 2,
+            1 if -0.5 <= x509_eq_two <= 0.5 else 2,
+        )
+
+    return kernel
+
+
+def calculate_criterions(x_list, sol_list):
+    """Calculate condition criteria for a list of solutions."""
+    kernel = _patient_kernel(tuple(x_list))
+    return [kernel(u_list) for u_list in sol_list]
+
+
+def perfect_criterions(x_list):
+    """Calculate the criterion vector of the ideal outcome for the condition."""
     x301, x302, _, _, _, _, x307, _, _ = x_list
 
     x509 = round(1.70408 + x302 * x307 * (-0.238892) + x301**2 * 0.170947)
-    c_list = [1, 1, 1, 1, 1, 1, 1, 1, x509]
-
-    saati_value = sum(-c * coeff for c, coeff in zip(c_list, coeff_list))
-    return round(saati_value, 15)
+    return (1, 1, 1, 1, 1, 1, 1, 1, x509)
 
 
 def main():
@@ -94,7 +210,7 @@ def main():
         9,
         random_solution,
         calculate_criterions,
-        calculate_perfect_value,
+        perfect_criterions,
         logger,
     )
 
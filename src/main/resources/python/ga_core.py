@@ -10,14 +10,17 @@ in FirstStage.py / SecondStage.py and is injected via function parameters.
 """
 
 import argparse
-import copy
 import json
 import logging
 import logging.handlers
 import math
 import os
 import sys
-from random import choices
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import accumulate
+from random import choices, random, seed
 
 
 # --- Configuration constants ---
@@ -31,6 +34,11 @@ MAX_GENERATIONS = 500
 # Tolerance for floating-point comparisons in convergence checks
 _FLOAT_REL_TOL = 1e-12
 
+# A run whose best discrepancy has not improved for this many consecutive
+# generations (mutations included) is considered converged and returns its
+# best solution early instead of burning the rest of MAX_GENERATIONS.
+_STALL_GENERATIONS = 50
+
 
 # --- Logging setup ---
 
@@ -65,6 +73,18 @@ def geometric_mean(values):
     return math.exp(log_sum / len(values))
 
 
+def uniform_int(low, high):
+    """Uniform integer in [low, high] from a single random() call.
+
+    random.randint goes through the randrange/_randbelow Python call chain
+    on every draw; for the small gene spans used here one C-level PRNG
+    call with scaling is equivalent (bias is on the order of 2**-53) and
+    several times cheaper.  Population seeding draws nine genes per
+    solution, every mutation generation, in every run.
+    """
+    return int(random() * (high - low + 1)) + low
+
+
 # --- AHP / Saati ---
 
 def saati_method():
@@ -80,58 +100,110 @@ def saati_method():
     return [g / total for g in gmean_list]
 
 
-def calculate_saati(coeff_list, criterion_list):
-    """Calculate Saati values for all solutions."""
-    return [
-        round(sum(-c * coeff for c, coeff in zip(c_list, coeff_list)), 15)
-        for c_list in criterion_list
-    ]
+# The comparison matrix above is fixed, so the priority vector is a
+# constant; compute it once at import instead of once per patient.  Kept
+# as a tuple so it can key the _saati_value cache directly.
+SAATI_COEFFICIENTS = tuple(saati_method())
 
 
-# --- Selection helpers ---
+@lru_cache(maxsize=1024)
+def _saati_value(coeff_tuple, criterion_tuple):
+    """Saati value of a single criterion vector, cached.
+
+    Criteria only take the values 1 and 2, so at most 2**SOLUTION_SIZE
+    distinct vectors exist and converged populations repeat a handful of
+    them every generation — the weighted sum is worth memoizing.
+    """
+    return round(sum(-c * coeff for c, coeff in zip(criterion_tuple, coeff_tuple)), 15)
+
+
+def calculate_saati(coeff_list, criterion_list):
+    """Calculate Saati values for all solutions.
+
+    Criterion rows and the coefficient vector are tuples throughout the
+    pipeline, so they feed the _saati_value cache without conversion.
+    """
+    return [_saati_value(coeff_list, c_list) for c_list in criterion_list]
 
-def get_discrepancies(perfect_value, saati_list):
-    """Calculate discrepancies from perfect value."""
-    return [perfect_value - s for s in saati_list]
 
+# --- Selection helpers ---
 
-def get_probabilities(disc_list):
-    """Convert discrepancies to selection probabilities.
+def get_selection_data(perfect_value, saati_list):
+    """Compute discrepancies, their mean, and selection probabilities.
 
-    Clamps each discrepancy to a small positive floor to prevent
-    ZeroDivisionError (when a solution already matches the optimum)
-    and negative probabilities (when a solution overshoots).
+    One pass over the population instead of the former chain of
+    get_discrepancies/get_probabilities comprehensions that each built an
+    intermediate list.  Each discrepancy is clamped to a small positive
+    floor to prevent ZeroDivisionError (when a solution already matches
+    the optimum) and negative probabilities (when a solution overshoots).
     """
     eps = 1e-15
-    clamped = [max(d, eps) for d in disc_list]
-    inv_list = [1.0 / d for d in clamped]
+    disc_list = []
+    inv_list = []
+    for s in saati_list:
+        d = perfect_value - s
+        disc_list.append(d)
+        inv_list.append(1.0 / (d if d > eps else eps))
     total = sum(inv_list)
-    return [i / total for i in inv_list]
+    prob_list = [i / total for i in inv_list]
+    return disc_list, sum(disc_list) / len(disc_list), prob_list
+
 
+def get_mothers(father_list, cum_weights):
+    """Select mother indices for crossover.
 
-def get_mothers(father_list, prob_list):
-    """Select mother indices for crossover."""
-    mother_list = []
-    for i in range(POPULATION_NUMBER):
-        m = choices(POPULATION_RANGE, prob_list)[0]
-        while m == father_list[i]:
-            m = choices(POPULATION_RANGE, prob_list)[0]
-        mother_list.append(m)
+    All mothers are drawn in one batch from the precomputed cumulative
+    distribution.  A draw that collides with its father is replaced by a
+    single exact draw from the distribution with the father excluded (the
+    father's probability segment is skipped in the inverse-CDF lookup), so
+    selection is bounded even when one parent holds almost all the weight —
+    the old redraw loop could spin arbitrarily long there.
+    """
+    mother_list = choices(POPULATION_RANGE, cum_weights=cum_weights,
+                          k=POPULATION_NUMBER)
+    total = cum_weights[-1]
+    last = POPULATION_NUMBER - 1
+    for i, father in enumerate(father_list):
+        if mother_list[i] != father:
+            continue
+        seg_start = cum_weights[father - 1] if father else 0.0
+        father_weight = cum_weights[father] - seg_start
+        u = random() * (total - father_weight)
+        if u >= seg_start:
+            u += father_weight
+        m = min(bisect_right(cum_weights, u), last)
+        if m == father:
+            # Float rounding landed exactly on the excluded segment's
+            # boundary; take the nearest neighbouring index.
+            m = m + 1 if m < last else m - 1
+        mother_list[i] = m
     return mother_list
 
 
 # --- Genetic operators ---
 
-def crossover(sol_list, temp_sol_list, father_list, mother_list):
-    """Perform crossover between parent solutions."""
-    for i in range(POPULATION_NUMBER):
-        j, k = father_list[i], mother_list[i]
-        for idx in range(SOLUTION_SIZE):
-            if idx < (i % 8) + 1:
-                sol_list[i][idx] = temp_sol_list[j if (i % 16) < 8 else k][idx]
-            else:
-                sol_list[i][idx] = temp_sol_list[k if (i % 16) < 8 else j][idx]
-    return sol_list
+# The crossover pattern depends only on the row index, never on population
+# contents: row i takes its first (i % 8) + 1 genes from one parent and the
+# rest from the other, with the parent order flipping every 8 rows.  The cut
+# points and parent order are therefore precomputed once at import.
+_CROSSOVER_CUTS = tuple((i % 8) + 1 for i in POPULATION_RANGE)
+_FATHER_LEADS = tuple((i % 16) < 8 for i in POPULATION_RANGE)
+
+
+def crossover(sol_list, father_list, mother_list):
+    """Build the next population by crossing parent solutions.
+
+    Returns a new population list; ``sol_list`` is only read, so callers
+    need no defensive copy of the current generation.
+    """
+    next_list = []
+    for lead, cut, f, m in zip(_FATHER_LEADS, _CROSSOVER_CUTS,
+                               father_list, mother_list):
+        father = sol_list[f]
+        mother = sol_list[m]
+        head, tail = (father, mother) if lead else (mother, father)
+        next_list.append(head[:cut] + tail[cut:])
+    return next_list
 
 
 def mutation(sol_list, random_solution_fn):
@@ -143,80 +215,160 @@ def mutation(sol_list, random_solution_fn):
 
 # --- Main GA loop ---
 
+def _single_run(x_list, coeff_list, perfect_criterion, perfect_value,
+                random_solution_fn, calculate_criterions_fn):
+    """Execute one independent GA restart.
+
+    Returns (treatment, complication, hit_limit).  May run in a worker
+    process, so it only touches its arguments and module-level constants.
+    """
+    # Worker processes inherit the parent's PRNG state under the "fork"
+    # start method; reseed so each restart explores independently.
+    seed()
+
+    sol_list = [random_solution_fn() for _ in range(POPULATION_NUMBER)]
+    prev_mean = None
+
+    # Best solution seen so far and how long it has gone unimproved.
+    best_disc = None
+    best_sol = None
+    best_crit = None
+    stall_count = 0
+
+    # Criterion rows are a pure function of the solution (the patient is
+    # fixed for the whole run), and identical solutions recur across
+    # generations once selection starts converging.  Cache rows per run
+    # and evaluate the GMDH models only for solutions not seen before.
+    criterion_cache = {}
+
+    for generation in range(MAX_GENERATIONS):
+        missing = list(dict.fromkeys(
+            row for row in sol_list if row not in criterion_cache))
+        if missing:
+            for row, crits in zip(missing,
+                                  calculate_criterions_fn(x_list, missing)):
+                criterion_cache[row] = crits
+        criterion_list = [criterion_cache[row] for row in sol_list]
+        saati_list = calculate_saati(coeff_list, criterion_list)
+
+        # Check for optimal solution.  The Saati value is a fixed linear
+        # map of the criteria, so matching the perfect criterion vector is
+        # equivalent to the old perfect-Saati-value tolerance check and
+        # costs only an element-wise comparison.
+        for i in range(POPULATION_NUMBER):
+            if criterion_list[i] == perfect_criterion:
+                return sol_list[i], criterion_list[i], False
+
+        # No optimal found — continue evolution
+        disc_list, mean_disc, prob_list = get_selection_data(perfect_value, saati_list)
+
+        # Track the best solution across generations.  If it stops
+        # improving for _STALL_GENERATIONS in a row the run has converged:
+        # return it early rather than spending the remaining generations
+        # re-treading the same region.
+        gen_best = min(disc_list)
+        if best_disc is None or (gen_best < best_disc
+                                 and not math.isclose(gen_best, best_disc,
+                                                      rel_tol=_FLOAT_REL_TOL)):
+            best_disc = gen_best
+            idx = disc_list.index(gen_best)
+            best_sol = sol_list[idx]
+            best_crit = criterion_list[idx]
+            stall_count = 0
+        else:
+            stall_count += 1
+            if stall_count >= _STALL_GENERATIONS:
+                return best_sol, best_crit, False
+
+        # Stagnation detection (tolerance-based).  Only the previous mean
+        # is ever consulted, so two scalars replace the old growing
+        # per-generation history list.
+        stagnated = (generation >= 2
+                     and math.isclose(prev_mean, mean_disc, rel_tol=_FLOAT_REL_TOL))
+        prev_mean = mean_disc
+
+        if stagnated:
+            sol_list = mutation(sol_list, random_solution_fn)
+        else:
+            # Build the cumulative distribution once per generation; every
+            # selection draw this generation reuses it.
+            cum_weights = list(accumulate(prob_list))
+            father_list = choices(POPULATION_RANGE, cum_weights=cum_weights,
+                                  k=POPULATION_NUMBER)
+
+            # Selection converged to a single parent — short-circuiting
+            # all() beats building a set of 32 ints every generation.
+            first_father = father_list[0]
+            if all(f == first_father for f in father_list):
+                return sol_list[first_father], criterion_list[first_father], False
+
+            mother_list = get_mothers(father_list, cum_weights)
+            sol_list = crossover(sol_list, father_list, mother_list)
+
+    # Generation limit reached — take the best solution from final population
+    disc_list, _, _ = get_selection_data(perfect_value, saati_list)
+    # index(min(...)) runs both scans at C level, unlike min over range()
+    # with a Python key function.
+    best_idx = disc_list.index(min(disc_list))
+    return sol_list[best_idx], criterion_list[best_idx], True
+
+
 def run_ga(x_list, random_solution_fn, calculate_criterions_fn,
-           calculate_perfect_value_fn, logger):
+           perfect_criterions_fn, logger):
     """Main genetic algorithm for finding optimal treatment strategies.
 
+    The GA_RUNS restarts are fully independent, so they are dispatched to a
+    process pool; environments where multiprocessing is unavailable fall
+    back to sequential execution.
+
     Parameters
     ----------
     x_list : list[float]
         Patient clinical input values.
-    random_solution_fn : callable() -> list[float]
+    random_solution_fn : callable() -> tuple[float, ...]
         Generates a single random treatment solution.
-    calculate_criterions_fn : callable(x_list, sol_list) -> list[list[int]]
+    calculate_criterions_fn : callable(x_list, sol_list) -> list[tuple[int, ...]]
         Evaluates GMDH condition criteria for a population.
-    calculate_perfect_value_fn : callable(x_list, coeff_list) -> float
-        Computes the ideal Saati value for the patient.
+    perfect_criterions_fn : callable(x_list) -> tuple[int, ...]
+        Computes the criterion vector of the ideal outcome; its Saati
+        value is derived here.
     logger : logging.Logger
         Logger instance for this stage.
     """
-    coeff_list = saati_method()
-    perfect_value = calculate_perfect_value_fn(x_list, coeff_list)
-
-    treatment_list = []
-    complication_list = []
+    coeff_list = SAATI_COEFFICIENTS
+    perfect_criterion = perfect_criterions_fn(x_list)
+    perfect_value = _saati_value(coeff_list, perfect_criterion)
 
     logger.info("Starting calculation with %d runs", GA_RUNS)
 
-    for run in range(GA_RUNS):
-        sol_list = [random_solution_fn() for _ in range(POPULATION_NUMBER)]
-        mean_list = []
-
-        for generation in range(MAX_GENERATIONS):
-            criterion_list = calculate_criterions_fn(x_list, sol_list)
-            saati_list = calculate_saati(coeff_list, criterion_list)
-
-            # Check for optimal solution (using tolerance instead of exact equality)
-            found = False
-            for i in range(POPULATION_NUMBER):
-                if math.isclose(saati_list[i], perfect_value, rel_tol=_FLOAT_REL_TOL):
-                    treatment_list.append(sol_list[i])
-                    complication_list.append(criterion_list[i])
-                    found = True
-                    break
-
-            if found:
-                break
-
-            # No optimal found — continue evolution
-            disc_list = get_discrepancies(perfect_value, saati_list)
-            mean_disc = sum(disc_list) / len(disc_list)
-            mean_list.append(mean_disc)
-
-            # Stagnation detection (tolerance-based)
-            if (len(mean_list) > 2
-                    and math.isclose(mean_list[-2], mean_list[-1], rel_tol=_FLOAT_REL_TOL)):
-                sol_list = mutation(copy.deepcopy(sol_list), random_solution_fn)
-            else:
-                prob_list = get_probabilities(disc_list)
-                father_list = choices(POPULATION_RANGE, prob_list, k=POPULATION_NUMBER)
-
-                if len(set(father_list)) <= 1:
-                    treatment_list.append(sol_list[father_list[0]])
-                    complication_list.append(criterion_list[father_list[0]])
-                    break
-
-                mother_list = get_mothers(father_list, prob_list)
-                temp_sol_list = copy.deepcopy(sol_list)
-                sol_list = crossover(sol_list, temp_sol_list, father_list, mother_list)
-        else:
-            # Generation limit reached — take the best solution from final population
-            disc_list = get_discrepancies(perfect_value, saati_list)
-            best_idx = min(range(POPULATION_NUMBER), key=lambda i: disc_list[i])
-            treatment_list.append(sol_list[best_idx])
-            complication_list.append(criterion_list[best_idx])
-            logger.warning("Run %d hit generation limit (%d)", run, MAX_GENERATIONS)
+    run_args = (x_list, coeff_list, perfect_criterion, perfect_value,
+                random_solution_fn, calculate_criterions_fn)
+    # No point spinning up more workers than there are runs to dispatch.
+    max_workers = min(GA_RUNS, os.cpu_count() or 1)
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(_single_run, *run_args)
+                       for _ in range(GA_RUNS)]
+            results = [future.result() for future in futures]
+    except OSError:
+        # Restricted environments (no fork/spawn support) run sequentially.
+        logger.warning("Process pool unavailable, running sequentially")
+        results = [_single_run(*run_args) for _ in range(GA_RUNS)]
 
+    treatment_list = []
+    complication_list = []
+    limit_runs = 0
+    for treatment, complication, hit_limit in results:
+        if hit_limit:
+            limit_runs += 1
+        treatment_list.append(treatment)
+        complication_list.append(complication)
+
+    # One summary record per request instead of one warning per run keeps
+    # handler/formatter work off the per-run path.
+    if limit_runs:
+        logger.warning("%d of %d runs hit the generation limit (%d)",
+                       limit_runs, GA_RUNS, MAX_GENERATIONS)
     logger.info("Found %d solutions", len(treatment_list))
 
     return {
@@ -228,22 +380,55 @@ def run_ga(x_list, random_solution_fn, calculate_criterions_fn,
 # --- CLI entry point shared by stage scripts ---
 
 def run_stage_cli(description, expected_input_length, random_solution_fn,
-                  calculate_criterions_fn, calculate_perfect_value_fn, logger):
+                  calculate_criterions_fn, perfect_criterions_fn, logger):
     """CLI boilerplate shared by FirstStage and SecondStage scripts."""
     parser = argparse.ArgumentParser(description=description)
-    parser.add_argument("--input", type=str, required=True, help="JSON input with xList")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--input", type=str, help="JSON input with xList")
+    group.add_argument("--input-file", type=str,
+                       help="path to a file containing the JSON input "
+                            "(avoids command-line escaping for callers)")
+    group.add_argument("--serve", action="store_true",
+                       help="run as a long-lived worker: one JSON request "
+                            "per stdin line, one JSON response per stdout "
+                            "line (amortizes interpreter startup across "
+                            "requests)")
     args = parser.parse_args()
 
-    try:
-        data = json.loads(args.input)
+    def handle(data):
         x_list = data["xList"]
-
         if len(x_list) != expected_input_length:
             raise ValueError(f"Expected {expected_input_length} input values, got {len(x_list)}")
+        return run_ga(x_list, random_solution_fn, calculate_criterions_fn,
+                      perfect_criterions_fn, logger)
+
+    def respond(result):
+        # Compact separators and an explicit flush: this line is the IPC
+        # response the Java parent blocks on.
+        sys.stdout.write(json.dumps(result, separators=(",", ":")) + "\n")
+        sys.stdout.flush()
+
+    if args.serve:
+        # A request failure must not kill the worker — the parent expects
+        # exactly one response line per request, so errors are reported
+        # in-band instead of via stderr/exit code as in one-shot mode.
+        for line in sys.stdin:
+            if not line.strip():
+                continue
+            try:
+                result = handle(json.loads(line))
+            except Exception as e:
+                result = {"error": str(e)}
+            respond(result)
+        return
 
-        result = run_ga(x_list, random_solution_fn, calculate_criterions_fn,
-                        calculate_perfect_value_fn, logger)
-        print(json.dumps(result))
+    try:
+        if args.input_file:
+            with open(args.input_file, encoding="utf-8") as input_file:
+                data = json.load(input_file)
+        else:
+            data = json.loads(args.input)
+        respond(handle(data))
 
     except Exception as e:
         print(json.dumps({"error": str(e)}), file=sys.stderr)